@@ -1,19 +1,873 @@
 import sys
 import os
+import json
+import re
+import shutil
+import tempfile
+import uuid
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
 from datetime import datetime, timedelta
 import calendar
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                             QLabel, QPushButton, QTabWidget, QTableWidget, QTableWidgetItem, 
                             QLineEdit, QFormLayout, QMessageBox, QComboBox, QDateEdit, QDialog,
                             QDialogButtonBox, QGroupBox, QGridLayout, QFileDialog)
-from PyQt5.QtCore import Qt, QDate
+from PyQt5.QtCore import Qt, QDate, QTimer
 from PyQt5.QtGui import QFont, QIcon
 import openpyxl
 from openpyxl.styles import Font, Alignment, Border, Side
 import locale
 
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
 # Set locale untuk format mata uang (titik sebagai pemisah ribuan)
-locale.setlocale(locale.LC_ALL, 'id_ID.UTF-8')
+try:
+    locale.setlocale(locale.LC_ALL, 'id_ID.UTF-8')
+except locale.Error:
+    # Locale belum terpasang (misalnya di server); format angka tidak bergantung padanya
+    pass
+
+EMPLOYEES_FILE = "data/employees.xlsx"
+ATTENDANCE_FILE = "data/attendance.xlsx"
+CHANGE_LOG_FILE = "data/changes.log"
+LOCK_FILE = "data/app.lock"
+
+# Sheet tersembunyi untuk menyimpan seq change log di dalam workbook
+META_SHEET = "_Meta"
+
+# Nama sheet -> file workbook yang menyimpannya
+SHEET_FILES = {
+    "Employees": EMPLOYEES_FILE,
+    "Attendance": ATTENDANCE_FILE,
+}
+
+# Jeda (ms) sebelum perubahan yang tertunda ditulis ke disk
+SAVE_DELAY_MS = 2000
+
+def write_atomic(path, write_fn):
+    # Tulis ke file sementara di folder yang sama, fsync, lalu rename
+    # sehingga file lama tetap utuh jika aplikasi crash saat menyimpan
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write_fn(f)
+            f.flush()
+            os.fsync(f.fileno())
+        
+        # mkstemp membuat file dengan mode 0600; samakan dengan file lama,
+        # atau mode default (sesuai umask) jika file belum ada
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp_path, 0o666 & ~umask)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    
+    # Pastikan entri direktori hasil rename juga tersimpan (hanya POSIX)
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+def save_workbook_atomic(wb, path):
+    write_atomic(path, wb.save)
+
+def read_workbook_seq(wb):
+    # Nomor urut change log terakhir yang sudah tersimpan di workbook,
+    # None untuk workbook lama yang belum punya sheet meta
+    if META_SHEET not in wb.sheetnames:
+        return None
+    for key, value in wb[META_SHEET].iter_rows(max_col=2, values_only=True):
+        if key == "seq":
+            return value
+    return None
+
+def write_workbook_seq(wb, seq):
+    if META_SHEET in wb.sheetnames:
+        ws = wb[META_SHEET]
+    else:
+        ws = wb.create_sheet(META_SHEET)
+        ws.sheet_state = "hidden"
+    ws["A1"] = "seq"
+    ws["B1"] = seq
+
+def read_saved_seq(path):
+    # Baca seq dari file di disk tanpa memuat seluruh workbook
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        return read_workbook_seq(wb)
+    finally:
+        wb.close()
+
+class WorkbookStore:
+    """Menyimpan workbook di memori dan menulis perubahan ke disk secara tertunda.
+
+    Setiap perubahan cukup ditandai dengan mark_dirty(); flush() menulis semua
+    workbook yang berubah sekaligus menggunakan save_workbook_atomic(). Nomor
+    urut change log (applied_seq) ikut disimpan di workbook pada save yang
+    sama, sehingga setelah crash diketahui record mana yang belum tersimpan.
+    """
+    
+    def __init__(self):
+        self.workbooks = {}
+        self.dirty = set()
+        self.applied_seq = None
+    
+    def get(self, path):
+        if path not in self.workbooks:
+            self.workbooks[path] = openpyxl.load_workbook(path)
+        return self.workbooks[path]
+    
+    def saved_seq(self, path):
+        if path in self.workbooks:
+            return read_workbook_seq(self.workbooks[path])
+        return read_saved_seq(path)
+    
+    def mark_dirty(self, path):
+        self.dirty.add(path)
+    
+    def has_pending(self):
+        return bool(self.dirty)
+    
+    def flush(self):
+        # File yang gagal disimpan tetap ditandai agar ikut di flush berikutnya
+        for path in sorted(self.dirty):
+            wb = self.workbooks[path]
+            if self.applied_seq is not None:
+                write_workbook_seq(wb, self.applied_seq)
+            save_workbook_atomic(wb, path)
+            self.dirty.discard(path)
+
+class DataLock:
+    """Kunci folder data agar GUI dan perintah command line tidak berjalan bersamaan."""
+    
+    def __init__(self, path=LOCK_FILE):
+        self.path = path
+        self.file = None
+    
+    def acquire(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        f = open(self.path, "a+")
+        try:
+            if os.name == "nt":
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            raise RuntimeError("Data sedang dipakai aplikasi lain, tutup aplikasi terlebih dahulu")
+        self.file = f
+    
+    def release(self):
+        if self.file is None:
+            return
+        if os.name == "nt":
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        self.file.close()
+        self.file = None
+    
+    def __enter__(self):
+        self.acquire()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.release()
+
+def cell_key(value):
+    # Nilai sel dalam bentuk yang bisa disimpan di JSON, untuk mencocokkan
+    # baris berdasarkan isinya
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return str(value)
+
+def attendance_row_key(row):
+    row = tuple(row[:5]) + (None,) * (5 - len(row))
+    return tuple(cell_key(value) for value in row[:5])
+
+def apply_change(get_sheet, change, sheets=("Employees", "Attendance")):
+    # Terapkan satu perubahan dari change log ke worksheet.
+    # get_sheet(nama) mengembalikan worksheet "Employees" atau "Attendance";
+    # hanya sheet di `sheets` yang diubah (dipakai saat memutar ulang log ke
+    # workbook yang sebagian sudah tersimpan). Mengembalikan nama sheet yang berubah.
+    op = change["op"]
+    touched = set()
+    
+    if op == "add_employee":
+        if "Employees" in sheets:
+            get_sheet("Employees").append(change["row"])
+            touched.add("Employees")
+        return touched
+    
+    if op == "edit_employee":
+        old_name = change["old_name"]
+        new_row = change["row"]
+        if "Employees" in sheets:
+            for row in get_sheet("Employees").iter_rows(min_row=2):
+                if row[0].value == old_name:
+                    row[0].value = new_row[0]
+                    row[1].value = new_row[1]
+                    row[2].value = new_row[2]
+                    break
+            touched.add("Employees")
+        
+        # Nama berubah, update juga data absensi
+        if new_row[0] != old_name and "Attendance" in sheets:
+            for row in get_sheet("Attendance").iter_rows(min_row=2):
+                if row[1].value == old_name:
+                    row[1].value = new_row[0]
+            touched.add("Attendance")
+        return touched
+    
+    if op == "delete_employee":
+        if "Employees" in sheets:
+            ws = get_sheet("Employees")
+            for row_idx, row in enumerate(ws.iter_rows(min_row=2), start=2):
+                if row[0].value == change["name"]:
+                    ws.delete_rows(row_idx)
+                    break
+            touched.add("Employees")
+        return touched
+    
+    if op == "add_attendance":
+        if "Attendance" in sheets:
+            ws = get_sheet("Attendance")
+            for att in change["rows"]:
+                ws.append(att)
+            touched.add("Attendance")
+        return touched
+    
+    if op == "delete_attendance":
+        if "Attendance" in sheets:
+            ws = get_sheet("Attendance")
+            rows_to_delete = []
+            for row_idx, row in enumerate(ws.iter_rows(min_row=2), start=2):
+                if row[0].value == change["date"]:
+                    rows_to_delete.append(row_idx)
+            
+            # Hapus dari bawah ke atas agar indeks tidak berubah
+            for row_idx in sorted(rows_to_delete, reverse=True):
+                ws.delete_rows(row_idx)
+            touched.add("Attendance")
+        return touched
+    
+    if op == "repair":
+        # Perbaikan dari cek integritas. Baris dicocokkan berdasarkan isinya
+        # (bukan nomor baris) agar tetap benar saat diputar ulang:
+        #   set_employees: [nama, kolom, nilai]
+        #   delete_attendance: [isi baris (lihat attendance_row_key)]
+        #   set_attendance: [tanggal, nama, kolom, nilai]
+        if "Employees" in sheets and change["set_employees"]:
+            fixes = {}
+            for name, col_idx, value in change["set_employees"]:
+                fixes.setdefault(name, []).append((col_idx, value))
+            for row in get_sheet("Employees").iter_rows(min_row=2):
+                for col_idx, value in fixes.get(row[0].value, []):
+                    row[col_idx - 1].value = value
+            touched.add("Employees")
+        
+        if "Attendance" in sheets and (change["delete_attendance"] or change["set_attendance"]):
+            ws = get_sheet("Attendance")
+            
+            # Setiap entri menghapus satu baris dengan isi yang sama
+            pending = Counter(tuple(key) for key in change["delete_attendance"])
+            rows_to_delete = []
+            for row_idx, row in enumerate(ws.iter_rows(min_row=2, max_col=5, values_only=True), start=2):
+                key = attendance_row_key(row)
+                if pending[key] > 0:
+                    pending[key] -= 1
+                    rows_to_delete.append(row_idx)
+            for row_idx in reversed(rows_to_delete):
+                ws.delete_rows(row_idx)
+            
+            fixes = {}
+            for date_key, name, col_idx, value in change["set_attendance"]:
+                fixes.setdefault((date_key, name), []).append((col_idx, value))
+            for row in ws.iter_rows(min_row=2, max_col=5):
+                for col_idx, value in fixes.get((cell_key(row[0].value), row[1].value), []):
+                    row[col_idx - 1].value = value
+            touched.add("Attendance")
+        return touched
+    
+    raise ValueError(f"Jenis perubahan tidak dikenal: {op}")
+
+def replay_changes(get_sheet, records, sheet_seqs):
+    # Putar ulang record ke sheet yang seq tersimpannya lebih kecil dari seq
+    # record. Mengembalikan nama sheet yang berubah.
+    touched = set()
+    for record in records:
+        stale = {sheet for sheet, seq in sheet_seqs.items() if seq < record["seq"]}
+        if stale:
+            touched |= apply_change(get_sheet, record, stale)
+    return touched
+
+def read_change_records(path):
+    # Baca record JSON per baris; baris terakhir yang terpotong (crash saat
+    # menulis) diabaikan
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+class ChangeLog:
+    """Log berurutan dari setiap perubahan data karyawan dan absensi.
+
+    Baris pertama adalah header dengan log_id unik dan start_seq; baris
+    berikutnya berisi satu record JSON dengan nomor urut (seq) yang naik
+    terus, sehingga backup cukup mengirim record setelah checkpoint terakhir.
+    """
+    
+    def __init__(self, path=CHANGE_LOG_FILE):
+        self.path = path
+        self.log_id = None
+        self.start_seq = 0
+        self.last_seq = 0
+        # Pesan jika log rusak dan harus dimulai ulang
+        self.error = None
+        
+        if os.path.exists(path):
+            valid_size = 0
+            corrupt_line = None
+            with open(path, "rb") as f:
+                for line_no, line in enumerate(f, start=1):
+                    if not line.endswith(b"\n"):
+                        break
+                    if line.strip():
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            corrupt_line = line_no
+                            break
+                        if "seq" in record:
+                            self.last_seq = record["seq"]
+                        else:
+                            self.log_id = record["log_id"]
+                            self.start_seq = self.last_seq = record["start_seq"]
+                    valid_size += len(line)
+            
+            if corrupt_line is not None:
+                # Simpan log lama untuk diperiksa, lalu mulai log baru
+                # dengan log_id baru agar backup berikutnya membuat snapshot
+                corrupt_path = f"{path}.{datetime.now():%Y%m%d%H%M%S}.rusak"
+                os.replace(path, corrupt_path)
+                self.log_id = None
+                self.error = (f"Baris {corrupt_line} change log rusak, "
+                              f"log lama disimpan di {corrupt_path}")
+            elif valid_size != os.path.getsize(path):
+                # Buang sisa baris yang terpotong agar record baru tidak tergabung
+                with open(path, "r+b") as f:
+                    f.truncate(valid_size)
+        
+        if self.log_id is None:
+            self.reset(self.last_seq)
+    
+    def reset(self, start_seq):
+        # Mulai log baru (kosong) yang melanjutkan nomor urut dari start_seq
+        self.log_id = uuid.uuid4().hex
+        self.start_seq = self.last_seq = start_seq
+        header = {"log_id": self.log_id, "start_seq": start_seq}
+        write_atomic(self.path, lambda f: f.write((json.dumps(header) + "\n").encode("utf-8")))
+    
+    def append(self, change):
+        record = {"seq": self.last_seq + 1,
+                  "time": datetime.now().isoformat(timespec="seconds")}
+        record.update(change)
+        
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        
+        self.last_seq = record["seq"]
+        return record
+    
+    def read_since(self, seq):
+        for record in read_change_records(self.path):
+            if "seq" in record and record["seq"] > seq:
+                yield record
+
+def commit_change(store, change_log, change):
+    # Catat perubahan ke change log terlebih dahulu, lalu terapkan ke
+    # workbook di memori. Mengembalikan nama sheet yang berubah.
+    record = change_log.append(change)
+    get_sheet = lambda name: store.get(SHEET_FILES[name])[name]
+    touched = apply_change(get_sheet, record)
+    for sheet in touched:
+        store.mark_dirty(SHEET_FILES[sheet])
+    store.applied_seq = record["seq"]
+    return touched
+
+def recover_data(store, change_log):
+    """Samakan workbook dengan change log saat aplikasi dibuka.
+
+    Record yang sudah tercatat di log tetapi belum tersimpan di workbook
+    (crash sebelum flush) diputar ulang ke store. Jika workbook justru lebih
+    baru dari log (log hilang atau rusak), log dimulai ulang dari seq
+    workbook. Perubahan hasil pemulihan perlu di-flush oleh pemanggil.
+    """
+    sheet_seqs = {}
+    for sheet, path in SHEET_FILES.items():
+        seq = store.saved_seq(path)
+        # Workbook tanpa sheet meta (dibuat sebelum ada change log) dianggap
+        # sudah sesuai dengan log; workbook baru selalu dibuat dengan seq 0
+        sheet_seqs[sheet] = change_log.last_seq if seq is None else seq
+    
+    store.applied_seq = change_log.last_seq
+    if max(sheet_seqs.values()) > change_log.last_seq:
+        change_log.reset(max(sheet_seqs.values()))
+        store.applied_seq = change_log.last_seq
+    elif min(sheet_seqs.values()) < change_log.last_seq:
+        get_sheet = lambda name: store.get(SHEET_FILES[name])[name]
+        records = change_log.read_since(min(sheet_seqs.values()))
+        replay_changes(get_sheet, records, sheet_seqs)
+    else:
+        return
+    
+    # Simpan seq terbaru di semua workbook agar snapshot berikutnya konsisten
+    for path in SHEET_FILES.values():
+        store.get(path)
+        store.mark_dirty(path)
+
+def write_json_atomic(path, data):
+    write_atomic(path, lambda f: f.write(json.dumps(data, indent=2).encode("utf-8")))
+
+def write_delta(deltas_dir, records):
+    first_seq = records[0]["seq"]
+    last_seq = records[-1]["seq"]
+    delta_path = os.path.join(deltas_dir, f"{first_seq:08d}-{last_seq:08d}.log")
+    lines = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+    write_atomic(delta_path, lambda f: f.write(lines.encode("utf-8")))
+
+def backup_data(backup_dir, change_log):
+    """Backup folder data ke backup_dir.
+
+    Backup pertama menyalin workbook sebagai snapshot dasar (base/) beserta
+    seq yang tersimpan di masing-masing workbook; record log setelah seq
+    tersebut ikut dikirim sebagai delta pertama. Backup berikutnya hanya
+    menulis record sejak checkpoint terakhir ke deltas/.
+    """
+    base_dir = os.path.join(backup_dir, "base")
+    deltas_dir = os.path.join(backup_dir, "deltas")
+    checkpoint_path = os.path.join(backup_dir, "checkpoint.json")
+    
+    checkpoint = None
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path, "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    
+    # Snapshot baru jika belum ada, jika checkpoint milik log lain (log
+    # dihapus, rusak, atau data dipulihkan dari backup), atau log lebih pendek
+    if (checkpoint is None or checkpoint.get("log_id") != change_log.log_id
+            or change_log.last_seq < checkpoint["last_seq"]):
+        if os.path.exists(deltas_dir):
+            shutil.rmtree(deltas_dir)
+        os.makedirs(base_dir, exist_ok=True)
+        os.makedirs(deltas_dir)
+        
+        base_seqs = {}
+        for sheet, path in SHEET_FILES.items():
+            base_path = os.path.join(base_dir, os.path.basename(path))
+            shutil.copy2(path, base_path)
+            seq = read_saved_seq(base_path)
+            base_seqs[sheet] = change_log.last_seq if seq is None else seq
+        
+        base_seq = min(base_seqs.values())
+        if base_seq < change_log.start_seq:
+            raise ValueError("Change log tidak lengkap, buka aplikasi sekali untuk "
+                             "menyamakan data sebelum membuat backup")
+        
+        # Workbook bisa tertinggal dari log (crash sebelum flush)
+        records = list(change_log.read_since(base_seq))
+        if records:
+            write_delta(deltas_dir, records)
+        
+        write_json_atomic(checkpoint_path, {"log_id": change_log.log_id,
+                                            "base_seqs": base_seqs,
+                                            "last_seq": change_log.last_seq})
+        return f"Snapshot penuh dibuat (seq {change_log.last_seq})"
+    
+    records = list(change_log.read_since(checkpoint["last_seq"]))
+    if not records:
+        return "Tidak ada perubahan sejak backup terakhir"
+    
+    write_delta(deltas_dir, records)
+    checkpoint["last_seq"] = records[-1]["seq"]
+    write_json_atomic(checkpoint_path, checkpoint)
+    return f"{len(records)} perubahan disimpan (seq {records[0]['seq']}-{records[-1]['seq']})"
+
+def restore_data(backup_dir, target_dir):
+    """Pulihkan snapshot dasar di backup_dir ke target_dir lalu putar ulang delta."""
+    with open(os.path.join(backup_dir, "checkpoint.json"), "r", encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    
+    target_files = {sheet: os.path.join(target_dir, os.path.basename(path))
+                    for sheet, path in SHEET_FILES.items()}
+    for path in target_files.values():
+        if os.path.exists(path):
+            raise FileExistsError(f"File {path} sudah ada, pilih folder tujuan yang kosong")
+    
+    os.makedirs(target_dir, exist_ok=True)
+    for path in target_files.values():
+        shutil.copy2(os.path.join(backup_dir, "base", os.path.basename(path)), path)
+    
+    base_seqs = checkpoint["base_seqs"]
+    seq = min(base_seqs.values())
+    records = []
+    deltas_dir = os.path.join(backup_dir, "deltas")
+    for delta_name in sorted(os.listdir(deltas_dir)):
+        for record in read_change_records(os.path.join(deltas_dir, delta_name)):
+            if record["seq"] <= seq:
+                continue
+            if record["seq"] != seq + 1:
+                raise ValueError(f"Delta tidak lengkap: seq {seq + 1} tidak ditemukan")
+            records.append(record)
+            seq = record["seq"]
+    if seq < checkpoint["last_seq"]:
+        raise ValueError(f"Delta tidak lengkap: seq {seq + 1} tidak ditemukan")
+    
+    store = WorkbookStore()
+    get_sheet = lambda name: store.get(target_files[name])[name]
+    replay_changes(get_sheet, records, base_seqs)
+    
+    # Semua workbook hasil restore disimpan dengan seq terakhir
+    for path in target_files.values():
+        store.get(path)
+        store.mark_dirty(path)
+    store.applied_seq = seq
+    store.flush()
+    
+    # Log baru dengan log_id sendiri, sehingga backup dari data hasil restore
+    # tidak tercampur dengan backup data asal
+    ChangeLog(os.path.join(target_dir, os.path.basename(CHANGE_LOG_FILE))).reset(seq)
+    
+    return seq
+
+def parse_number(value):
+    # Konversi teks angka ("9", "7,5") ke int/float, misalnya untuk input
+    # filter lembur. Mengembalikan None jika tidak bisa dikonversi.
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if not isinstance(value, str):
+        return None
+    
+    text = value.strip().replace(",", ".")
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+def parse_int(value, thousands=False):
+    # Konversi ke int hanya jika hasilnya pasti ("8", 9.0, "10.000" untuk
+    # gaji dengan thousands=True). Nilai pecahan atau ambigu seperti "7,5"
+    # dan "10,000" menghasilkan None, karena aplikasi hanya memakai int.
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else None
+    if not isinstance(value, str):
+        return None
+    
+    text = value.strip()
+    if thousands:
+        text = text.replace("Rp", "").strip()
+        if re.fullmatch(r"\d{1,3}(\.\d{3})+", text):
+            text = text.replace(".", "")
+    if re.fullmatch(r"\d+", text):
+        return int(text)
+    return None
+
+def parse_date(value):
+    # Tanggal absensi harus teks yyyy-MM-dd; datetime dari Excel dan teks
+    # tanpa nol di depan ("2024-3-1") tetap dikenali agar bisa diperbaiki
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        try:
+            return datetime.strptime(value, "%Y-%m-%d").date()
+        except ValueError:
+            return None
+    return None
+
+class IntegrityReport:
+    """Hasil cek integritas data karyawan dan absensi.
+
+    Nomor baris hanya untuk ditampilkan; repair_change() memakai isi baris
+    sehingga perubahan "repair" di change log tidak bergantung pada posisi.
+    """
+    
+    # Jumlah maksimal contoh per jenis masalah di ringkasan
+    SUMMARY_LIMIT = 10
+    
+    def __init__(self):
+        self.orphans = []      # (baris, nama, tanggal, isi baris)
+        self.duplicates = []   # (baris, nama, tanggal, baris yang dipertahankan, isi baris)
+        self.gaps = []         # tanggal tanpa data absensi sama sekali
+        # (sheet, baris, kolom, nilai, nilai perbaikan / None, kunci baris);
+        # kunci baris: nama untuk Employees, [tanggal, nama] untuk Attendance
+        self.type_errors = []
+    
+    def has_problems(self):
+        return bool(self.orphans or self.duplicates or self.gaps or self.type_errors)
+    
+    def summary(self):
+        lines = [
+            f"Absensi tanpa karyawan: {len(self.orphans)}",
+            f"Absensi ganda: {len(self.duplicates)}",
+            f"Tanggal tanpa absensi: {len(self.gaps)}",
+            f"Tipe data salah: {len(self.type_errors)}",
+        ]
+        
+        for row_idx, name, date_str, key in self.orphans[:self.SUMMARY_LIMIT]:
+            lines.append(f"- Baris {row_idx}: {name} ({date_str}) tidak ada di data karyawan")
+        for row_idx, name, date_str, kept_row, key in self.duplicates[:self.SUMMARY_LIMIT]:
+            lines.append(f"- Baris {row_idx}: {name} ({date_str}) sama dengan baris {kept_row}")
+        for date in self.gaps[:self.SUMMARY_LIMIT]:
+            lines.append(f"- Tidak ada absensi tanggal {date.isoformat()}")
+        for sheet, row_idx, col_idx, value, fixed, match in self.type_errors[:self.SUMMARY_LIMIT]:
+            lines.append(f"- {sheet} baris {row_idx} kolom {col_idx}: {value!r} bukan nilai yang valid")
+        
+        return "\n".join(lines)
+    
+    def repair_change(self):
+        # Absensi tanpa karyawan dan absensi ganda dihapus, tipe data yang
+        # bisa dikonversi diperbaiki. Tanggal kosong tidak bisa diperbaiki.
+        change = {
+            "op": "repair",
+            "set_employees": [],
+            "delete_attendance": [list(orphan[-1]) for orphan in self.orphans] +
+                                 [list(duplicate[-1]) for duplicate in self.duplicates],
+            "set_attendance": [],
+        }
+        
+        for sheet, row_idx, col_idx, value, fixed, match in self.type_errors:
+            if fixed is None:
+                continue
+            if sheet == "Employees":
+                change["set_employees"].append([match, col_idx, fixed])
+            else:
+                change["set_attendance"].append(match + [col_idx, fixed])
+        
+        if not (change["set_employees"] or change["delete_attendance"] or change["set_attendance"]):
+            return None
+        return change
+
+def check_integrity(employee_rows, attendance_rows):
+    """Cek data dalam satu kali baca.
+
+    employee_rows dan attendance_rows adalah baris data (tanpa header) dari
+    iter_rows(min_row=2, values_only=True), sehingga bisa dipakai dengan
+    workbook read-only untuk file yang besar.
+    """
+    report = IntegrityReport()
+    
+    employee_names = set()
+    for row_idx, row in enumerate(employee_rows, start=2):
+        if not row or not row[0]:
+            continue
+        employee_names.add(row[0])
+        for col_idx in (2, 3):
+            value = row[col_idx - 1] if len(row) >= col_idx else None
+            if isinstance(value, bool) or not isinstance(value, int):
+                fixed = parse_int(value, thousands=True)
+                report.type_errors.append(("Employees", row_idx, col_idx, value, fixed, row[0]))
+    
+    # (nama, tanggal) -> baris terakhir; absensi yang diinput belakangan
+    # dianggap paling benar, jadi baris sebelumnya yang dihapus saat repair
+    last_rows = {}
+    dates = set()
+    for row_idx, row in enumerate(attendance_rows, start=2):
+        row = tuple(row) + (None,) * (5 - len(row))
+        date_value, name, status, work_hours, overtime_hours = row[:5]
+        if all(value is None for value in row[:5]):
+            continue
+        row_key = attendance_row_key(row)
+        match = [row_key[0], row_key[1]]
+        
+        # Tanggal dibandingkan sebagai teks di seluruh aplikasi, jadi harus
+        # persis yyyy-MM-dd
+        date = parse_date(date_value)
+        if date is None or date_value != date.isoformat():
+            fixed = date.isoformat() if date else None
+            report.type_errors.append(("Attendance", row_idx, 1, date_value, fixed, match))
+        if date:
+            dates.add(date)
+        
+        for col_idx, value in ((4, work_hours), (5, overtime_hours)):
+            if isinstance(value, bool) or not isinstance(value, int):
+                fixed = parse_int(value)
+                if value is None:
+                    fixed = 0
+                report.type_errors.append(("Attendance", row_idx, col_idx, value, fixed, match))
+        
+        date_str = date.isoformat() if date else date_value
+        if name not in employee_names:
+            report.orphans.append((row_idx, name, date_str, row_key))
+            continue
+        
+        # Tanpa tanggal yang valid tidak bisa dipastikan baris ini ganda;
+        # sudah dilaporkan sebagai tipe data salah
+        if date is None:
+            continue
+        
+        key = (name, date_str)
+        if key in last_rows:
+            previous_idx, previous_key = last_rows[key]
+            report.duplicates.append((previous_idx, name, date_str, row_idx, previous_key))
+        last_rows[key] = (row_idx, row_key)
+    
+    if dates:
+        day = min(dates)
+        last_day = max(dates)
+        while day <= last_day:
+            if day not in dates:
+                report.gaps.append(day)
+            day += timedelta(days=1)
+    
+    # Baris yang akan dihapus tidak perlu diperbaiki tipenya
+    deleted = {row[0] for row in report.orphans} | {row[0] for row in report.duplicates}
+    report.type_errors = [error for error in report.type_errors
+                          if not (error[0] == "Attendance" and error[1] in deleted)]
+    
+    return report
+
+class AttendanceIndex:
+    """Indeks absensi di memori untuk pencarian per nama dan rentang tanggal.
+
+    Dibangun sekali dari sheet Attendance lalu diperbarui dengan add_rows() dan
+    delete_date(); pencarian memakai bisect pada daftar yang sudah terurut
+    sehingga tidak perlu membaca ulang seluruh sheet.
+    """
+    
+    def __init__(self, attendance_rows):
+        # Semua baris dengan tanggal valid, terurut per tanggal (stabil,
+        # urutan input dalam satu tanggal tetap dipertahankan)
+        self.rows = []
+        for row in attendance_rows:
+            row = tuple(row[:5]) + (None,) * (5 - len(row))
+            if isinstance(row[0], str):
+                self.rows.append(row)
+        self.rows.sort(key=lambda row: row[0])
+        self.dates = [row[0] for row in self.rows]
+        
+        # Nama -> (baris, tanggal) terurut per tanggal
+        self.by_name = {}
+        for row in self.rows:
+            if isinstance(row[1], str):
+                rows, dates = self.by_name.setdefault(row[1], ([], []))
+                rows.append(row)
+                dates.append(row[0])
+        
+        # (kata kunci, nama) terurut untuk pencarian awalan
+        name_keys = set()
+        for name in self.by_name:
+            name_keys.update(self.keys_for_name(name))
+        self.name_keys = sorted(name_keys)
+    
+    @staticmethod
+    def keys_for_name(name):
+        # Nama lengkap dan setiap kata di nama bisa dipakai sebagai awalan
+        lowered = name.lower()
+        keys = {(lowered, name)}
+        for word in lowered.split()[1:]:
+            keys.add((word, name))
+        return keys
+    
+    def add_rows(self, attendance_rows):
+        # Sisipkan baris baru tanpa membangun ulang indeks; bisect_right
+        # menjaga urutan input untuk tanggal yang sama
+        for row in attendance_rows:
+            row = tuple(row[:5]) + (None,) * (5 - len(row))
+            if not isinstance(row[0], str):
+                continue
+            
+            position = bisect_right(self.dates, row[0])
+            self.rows.insert(position, row)
+            self.dates.insert(position, row[0])
+            
+            if isinstance(row[1], str):
+                if row[1] not in self.by_name:
+                    self.by_name[row[1]] = ([], [])
+                    for key in self.keys_for_name(row[1]):
+                        insort(self.name_keys, key)
+                rows, dates = self.by_name[row[1]]
+                position = bisect_right(dates, row[0])
+                rows.insert(position, row)
+                dates.insert(position, row[0])
+    
+    def delete_date(self, date):
+        # Hapus semua baris satu tanggal (sama seperti delete_attendance)
+        start = bisect_left(self.dates, date)
+        end = bisect_right(self.dates, date)
+        names = {row[1] for row in self.rows[start:end] if isinstance(row[1], str)}
+        del self.rows[start:end]
+        del self.dates[start:end]
+        
+        for name in names:
+            rows, dates = self.by_name[name]
+            start = bisect_left(dates, date)
+            end = bisect_right(dates, date)
+            del rows[start:end]
+            del dates[start:end]
+            if not rows:
+                del self.by_name[name]
+                for key in self.keys_for_name(name):
+                    del self.name_keys[bisect_left(self.name_keys, key)]
+    
+    def find_names(self, prefix):
+        prefix = prefix.strip().lower()
+        names = set()
+        for key, name in self.name_keys[bisect_left(self.name_keys, (prefix,)):]:
+            if not key.startswith(prefix):
+                break
+            names.add(name)
+        return names
+    
+    def search(self, name_prefix="", from_date="", to_date="9999-99-99", min_overtime=None):
+        # Tanggal dalam format yyyy-MM-dd sehingga bisa dibandingkan sebagai teks
+        if name_prefix.strip():
+            results = []
+            for name in self.find_names(name_prefix):
+                rows, dates = self.by_name[name]
+                results.extend(rows[bisect_left(dates, from_date):bisect_right(dates, to_date)])
+            results.sort(key=lambda row: (row[0], row[1]))
+        else:
+            results = self.rows[bisect_left(self.dates, from_date):bisect_right(self.dates, to_date)]
+        
+        if min_overtime is not None:
+            filtered = []
+            for row in results:
+                overtime = parse_number(row[4])
+                if overtime is not None and overtime > min_overtime:
+                    filtered.append(row)
+            results = filtered
+        
+        return results
 
 class EmployeeDialog(QDialog):
     def __init__(self, parent=None, employee_data=None):
@@ -155,8 +1009,20 @@ class AttendanceDialog(QDialog):
 class LaundryPayrollApp(QMainWindow):
     def __init__(self):
         super().__init__()
+        self.store = WorkbookStore()
+        self.change_log = None
+        self.attendance_index = None
+        
+        # Timer write-behind: semua perubahan dalam satu interval digabung
+        # menjadi satu kali tulis ke disk
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(SAVE_DELAY_MS)
+        self.save_timer.timeout.connect(self.auto_flush)
+        
         self.initUI()
         self.check_and_create_files()
+        self.open_change_log()
         self.load_employee_data()
         
     def initUI(self):
@@ -194,9 +1060,13 @@ class LaundryPayrollApp(QMainWindow):
         self.delete_employee_btn = QPushButton("Hapus Karyawan")
         self.delete_employee_btn.clicked.connect(self.delete_employee)
         
+        self.backup_btn = QPushButton("Backup Data")
+        self.backup_btn.clicked.connect(self.backup)
+        
         employee_buttons.addWidget(self.add_employee_btn)
         employee_buttons.addWidget(self.edit_employee_btn)
         employee_buttons.addWidget(self.delete_employee_btn)
+        employee_buttons.addWidget(self.backup_btn)
         employee_layout.addLayout(employee_buttons)
         
         # Tab Absensi
@@ -214,6 +1084,41 @@ class LaundryPayrollApp(QMainWindow):
         date_filter.addWidget(self.attendance_date)
         attendance_layout.addLayout(date_filter)
         
+        # Panel pencarian absensi berdasarkan nama, rentang tanggal dan lembur
+        search_box = QGroupBox("Cari Absensi")
+        search_layout = QHBoxLayout()
+        search_layout.addWidget(QLabel("Nama:"))
+        self.search_name_input = QLineEdit()
+        self.search_name_input.setPlaceholderText("Awalan nama")
+        self.search_name_input.returnPressed.connect(self.search_attendance)
+        search_layout.addWidget(self.search_name_input)
+        
+        search_layout.addWidget(QLabel("Dari:"))
+        self.search_from_date = QDateEdit()
+        self.search_from_date.setCalendarPopup(True)
+        self.search_from_date.setDate(QDate.currentDate().addDays(-30))
+        search_layout.addWidget(self.search_from_date)
+        
+        search_layout.addWidget(QLabel("Sampai:"))
+        self.search_to_date = QDateEdit()
+        self.search_to_date.setCalendarPopup(True)
+        self.search_to_date.setDate(QDate.currentDate())
+        search_layout.addWidget(self.search_to_date)
+        
+        search_layout.addWidget(QLabel("Lembur >"))
+        self.search_overtime_input = QLineEdit()
+        self.search_overtime_input.setPlaceholderText("Jam")
+        self.search_overtime_input.setMaximumWidth(60)
+        self.search_overtime_input.returnPressed.connect(self.search_attendance)
+        search_layout.addWidget(self.search_overtime_input)
+        
+        self.search_btn = QPushButton("Cari")
+        self.search_btn.clicked.connect(self.search_attendance)
+        search_layout.addWidget(self.search_btn)
+        
+        search_box.setLayout(search_layout)
+        attendance_layout.addWidget(search_box)
+        
         # Tabel absensi
         self.attendance_table = QTableWidget()
         self.attendance_table.setColumnCount(5)
@@ -229,7 +1134,11 @@ class LaundryPayrollApp(QMainWindow):
         self.delete_attendance_btn.clicked.connect(self.delete_attendance)
         
         attendance_buttons.addWidget(self.add_attendance_btn)
+        self.check_data_btn = QPushButton("Cek Data")
+        self.check_data_btn.clicked.connect(self.check_data)
+        
         attendance_buttons.addWidget(self.delete_attendance_btn)
+        attendance_buttons.addWidget(self.check_data_btn)
         attendance_layout.addLayout(attendance_buttons)
         
         # Tab Laporan Gaji
@@ -285,24 +1194,105 @@ class LaundryPayrollApp(QMainWindow):
             os.makedirs("data")
         
         # File karyawan
-        if not os.path.exists("data/employees.xlsx"):
+        if not os.path.exists(EMPLOYEES_FILE):
             wb = openpyxl.Workbook()
             ws = wb.active
             ws.title = "Employees"
             ws.append(["Nama", "Gaji Pokok", "Lembur"])
-            wb.save("data/employees.xlsx")
+            write_workbook_seq(wb, 0)
+            save_workbook_atomic(wb, EMPLOYEES_FILE)
         
         # File absensi
-        if not os.path.exists("data/attendance.xlsx"):
+        if not os.path.exists(ATTENDANCE_FILE):
             wb = openpyxl.Workbook()
             ws = wb.active
             ws.title = "Attendance"
             ws.append(["Tanggal", "Nama", "Status", "Jam Kerja", "Jam Lembur"])
-            wb.save("data/attendance.xlsx")
+            write_workbook_seq(wb, 0)
+            save_workbook_atomic(wb, ATTENDANCE_FILE)
+    
+    def schedule_save(self, path):
+        # Tandai workbook berubah; timer tidak di-restart agar data paling
+        # lama tertunda SAVE_DELAY_MS walaupun pengguna terus mengedit
+        self.store.mark_dirty(path)
+        if not self.save_timer.isActive():
+            self.save_timer.start()
+    
+    def open_change_log(self):
+        self.change_log = ChangeLog()
+        if self.change_log.error:
+            QMessageBox.warning(self, "Peringatan", self.change_log.error)
+        
+        try:
+            # Putar ulang perubahan yang belum tersimpan karena crash
+            recover_data(self.store, self.change_log)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Gagal memulihkan data dari change log: {e}")
+            return
+        if self.store.has_pending():
+            self.flush_data()
+    
+    def record_change(self, change):
+        # Catat ke change log, terapkan ke workbook di memori, lalu
+        # jadwalkan penyimpanan
+        touched = commit_change(self.store, self.change_log, change)
+        for sheet in touched:
+            self.schedule_save(SHEET_FILES[sheet])
+        
+        if "Attendance" in touched and self.attendance_index is not None:
+            # Input dan hapus absensi diperbarui langsung di indeks; perubahan
+            # lain (ganti nama, repair) membuat indeks dibangun ulang saat
+            # dibutuhkan berikutnya
+            if change["op"] == "add_attendance":
+                self.attendance_index.add_rows(change["rows"])
+            elif change["op"] == "delete_attendance":
+                self.attendance_index.delete_date(change["date"])
+            else:
+                self.attendance_index = None
+    
+    def get_attendance_index(self):
+        if self.attendance_index is None:
+            ws = self.store.get(ATTENDANCE_FILE)["Attendance"]
+            self.attendance_index = AttendanceIndex(ws.iter_rows(min_row=2, values_only=True))
+        return self.attendance_index
+    
+    def auto_flush(self):
+        # Dipanggil oleh save_timer. Tidak memakai dialog modal: event loop
+        # dialog bisa menjalankan timer lagi dan menumpuk dialog. Jika gagal
+        # (misalnya file sedang dibuka di Excel), perubahan tetap tertunda dan
+        # dicoba lagi pada edit berikutnya atau saat aplikasi ditutup.
+        try:
+            self.store.flush()
+            self.statusBar().clearMessage()
+        except Exception as e:
+            self.statusBar().showMessage(f"Gagal menyimpan data ke disk, akan dicoba lagi: {e}")
+    
+    def flush_data(self):
+        self.save_timer.stop()
+        try:
+            self.store.flush()
+            self.statusBar().clearMessage()
+            return True
+        except Exception as e:
+            # Perubahan tetap tertunda dan dicoba lagi pada edit berikutnya
+            # atau saat aplikasi ditutup
+            QMessageBox.critical(self, "Error", f"Gagal menyimpan data ke disk: {e}")
+            return False
+    
+    def closeEvent(self, event):
+        # Tulis semua perubahan yang masih tertunda sebelum aplikasi ditutup
+        if self.store.has_pending() and not self.flush_data():
+            reply = QMessageBox.question(self, "Konfirmasi",
+                                        "Sebagian data belum tersimpan. Tetap keluar?",
+                                        QMessageBox.Yes | QMessageBox.No)
+            if reply == QMessageBox.No:
+                event.ignore()
+                return
+        event.accept()
     
     def load_employee_data(self):
         try:
-            wb = openpyxl.load_workbook("data/employees.xlsx")
+            wb = self.store.get(EMPLOYEES_FILE)
             ws = wb["Employees"]
             
             # Clear tabel terlebih dahulu
@@ -335,38 +1325,55 @@ class LaundryPayrollApp(QMainWindow):
     def load_attendance_data(self):
         try:
             selected_date = self.attendance_date.date().toString("yyyy-MM-dd")
-            
-            wb = openpyxl.load_workbook("data/attendance.xlsx")
-            ws = wb["Attendance"]
-            
-            # Clear tabel terlebih dahulu
-            self.attendance_table.setRowCount(0)
-            
-            for row in ws.iter_rows(min_row=2, values_only=True):
-                if row[0] == selected_date:
-                    row_position = self.attendance_table.rowCount()
-                    self.attendance_table.insertRow(row_position)
-                    
-                    for col, value in enumerate(row):
-                        item = QTableWidgetItem(str(value))
-                        self.attendance_table.setItem(row_position, col, item)
-            
-            # Resize kolom agar sesuai dengan konten
-            self.attendance_table.resizeColumnsToContents()
+            rows = self.get_attendance_index().search(from_date=selected_date, to_date=selected_date)
+            self.show_attendance_rows(rows)
             
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Gagal memuat data absensi: {e}")
     
+    def search_attendance(self):
+        min_overtime = None
+        overtime_text = self.search_overtime_input.text().strip()
+        if overtime_text:
+            min_overtime = parse_number(overtime_text)
+            if min_overtime is None:
+                QMessageBox.warning(self, "Error", "Jam lembur harus berupa angka!")
+                return
+        
+        try:
+            rows = self.get_attendance_index().search(
+                name_prefix=self.search_name_input.text(),
+                from_date=self.search_from_date.date().toString("yyyy-MM-dd"),
+                to_date=self.search_to_date.date().toString("yyyy-MM-dd"),
+                min_overtime=min_overtime
+            )
+            self.show_attendance_rows(rows)
+            
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Gagal mencari data absensi: {e}")
+    
+    def show_attendance_rows(self, rows):
+        # Clear tabel terlebih dahulu
+        self.attendance_table.setRowCount(0)
+        
+        for row in rows:
+            row_position = self.attendance_table.rowCount()
+            self.attendance_table.insertRow(row_position)
+            
+            for col, value in enumerate(row):
+                item = QTableWidgetItem(str(value))
+                self.attendance_table.setItem(row_position, col, item)
+        
+        # Resize kolom agar sesuai dengan konten
+        self.attendance_table.resizeColumnsToContents()
+    
     def add_employee(self):
         dialog = EmployeeDialog(self)
         if dialog.exec_():
             employee_data = dialog.get_employee_data()
             if employee_data:
                 try:
-                    wb = openpyxl.load_workbook("data/employees.xlsx")
-                    ws = wb["Employees"]
-                    ws.append(employee_data)
-                    wb.save("data/employees.xlsx")
+                    self.record_change({"op": "add_employee", "row": employee_data})
                     
                     QMessageBox.information(self, "Sukses", "Data karyawan berhasil ditambahkan!")
                     self.load_employee_data()
@@ -391,22 +1398,10 @@ class LaundryPayrollApp(QMainWindow):
                     new_data = dialog.get_employee_data()
                     if new_data:
                         try:
-                            wb = openpyxl.load_workbook("data/employees.xlsx")
-                            ws = wb["Employees"]
-                            
-                            # Update data di excel
-                            for row in ws.iter_rows(min_row=2):
-                                if row[0].value == employee_name:
-                                    row[0].value = new_data[0]
-                                    row[1].value = new_data[1]
-                                    row[2].value = new_data[2]
-                                    break
-                            
-                            wb.save("data/employees.xlsx")
-                            
-                            # Update juga data absensi jika nama berubah
-                            if new_data[0] != employee_name:
-                                self.update_attendance_employee_name(employee_name, new_data[0])
+                            # Data absensi ikut diupdate jika nama berubah
+                            self.record_change({"op": "edit_employee",
+                                                "old_name": employee_name,
+                                                "row": new_data})
                             
                             QMessageBox.information(self, "Sukses", "Data karyawan berhasil diupdate!")
                             self.load_employee_data()
@@ -415,19 +1410,6 @@ class LaundryPayrollApp(QMainWindow):
         else:
             QMessageBox.warning(self, "Peringatan", "Pilih karyawan yang akan diedit terlebih dahulu!")
     
-    def update_attendance_employee_name(self, old_name, new_name):
-        try:
-            wb = openpyxl.load_workbook("data/attendance.xlsx")
-            ws = wb["Attendance"]
-            
-            for row in ws.iter_rows(min_row=2):
-                if row[1].value == old_name:
-                    row[1].value = new_name
-            
-            wb.save("data/attendance.xlsx")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Gagal mengupdate nama karyawan di absensi: {e}")
-    
     def delete_employee(self):
         selected_row = self.employee_table.currentRow()
         if selected_row >= 0:
@@ -439,16 +1421,7 @@ class LaundryPayrollApp(QMainWindow):
             
             if reply == QMessageBox.Yes:
                 try:
-                    wb = openpyxl.load_workbook("data/employees.xlsx")
-                    ws = wb["Employees"]
-                    
-                    # Cari dan hapus baris yang sesuai
-                    for row_idx, row in enumerate(ws.iter_rows(min_row=2), start=2):
-                        if row[0].value == employee_name:
-                            ws.delete_rows(row_idx)
-                            break
-                    
-                    wb.save("data/employees.xlsx")
+                    self.record_change({"op": "delete_employee", "name": employee_name})
                     
                     QMessageBox.information(self, "Sukses", "Data karyawan berhasil dihapus!")
                     self.load_employee_data()
@@ -465,7 +1438,7 @@ class LaundryPayrollApp(QMainWindow):
         selected_date = self.attendance_date.date()
         
         # Cek apakah sudah ada data absensi di tanggal tersebut
-        wb = openpyxl.load_workbook("data/attendance.xlsx")
+        wb = self.store.get(ATTENDANCE_FILE)
         ws = wb["Attendance"]
         date_str = selected_date.toString("yyyy-MM-dd")
         
@@ -483,29 +1456,16 @@ class LaundryPayrollApp(QMainWindow):
                 return
             else:
                 # Hapus data lama
-                rows_to_delete = []
-                for row_idx, row in enumerate(ws.iter_rows(min_row=2), start=2):
-                    if row[0].value == date_str:
-                        rows_to_delete.append(row_idx)
-                
-                # Hapus dari bawah ke atas agar indeks tidak berubah
-                for row_idx in sorted(rows_to_delete, reverse=True):
-                    ws.delete_rows(row_idx)
-                wb.save("data/attendance.xlsx")
+                self.record_change({"op": "delete_attendance", "date": date_str})
         
         dialog = AttendanceDialog(self, self.employees, selected_date)
         if dialog.exec_():
             attendance_data = dialog.get_attendance_data()
             if attendance_data:
                 try:
-                    wb = openpyxl.load_workbook("data/attendance.xlsx")
-                    ws = wb["Attendance"]
-                    
                     # Tambahkan data absensi baru
-                    for att in attendance_data:
-                        ws.append(att)
+                    self.record_change({"op": "add_attendance", "rows": attendance_data})
                     
-                    wb.save("data/attendance.xlsx")
                     QMessageBox.information(self, "Sukses", "Data absensi berhasil disimpan!")
                     self.load_attendance_data()
                 except Exception as e:
@@ -520,33 +1480,68 @@ class LaundryPayrollApp(QMainWindow):
         
         if reply == QMessageBox.Yes:
             try:
-                wb = openpyxl.load_workbook("data/attendance.xlsx")
-                ws = wb["Attendance"]
-                
-                # Cari dan hapus baris yang sesuai
-                rows_to_delete = []
-                for row_idx, row in enumerate(ws.iter_rows(min_row=2), start=2):
-                    if row[0].value == selected_date:
-                        rows_to_delete.append(row_idx)
-                
-                # Hapus dari bawah ke atas agar indeks tidak berubah
-                for row_idx in sorted(rows_to_delete, reverse=True):
-                    ws.delete_rows(row_idx)
-                
-                wb.save("data/attendance.xlsx")
+                self.record_change({"op": "delete_attendance", "date": selected_date})
                 
                 QMessageBox.information(self, "Sukses", "Data absensi berhasil dihapus!")
                 self.load_attendance_data()
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Gagal menghapus data absensi: {e}")
     
+    def check_data(self):
+        try:
+            employee_ws = self.store.get(EMPLOYEES_FILE)["Employees"]
+            attendance_ws = self.store.get(ATTENDANCE_FILE)["Attendance"]
+            report = check_integrity(employee_ws.iter_rows(min_row=2, values_only=True),
+                                     attendance_ws.iter_rows(min_row=2, values_only=True))
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Gagal mengecek data: {e}")
+            return
+        
+        if not report.has_problems():
+            QMessageBox.information(self, "Cek Data", "Tidak ditemukan masalah pada data.")
+            return
+        
+        repair = report.repair_change()
+        if repair is None:
+            QMessageBox.warning(self, "Cek Data", report.summary())
+            return
+        
+        reply = QMessageBox.question(self, "Cek Data",
+                                    report.summary() + "\n\nPerbaiki otomatis? Absensi tanpa "
+                                    "karyawan dan absensi ganda akan dihapus.",
+                                    QMessageBox.Yes | QMessageBox.No)
+        if reply == QMessageBox.Yes:
+            try:
+                self.record_change(repair)
+                QMessageBox.information(self, "Sukses", "Data berhasil diperbaiki!")
+                self.load_employee_data()
+                self.load_attendance_data()
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Gagal memperbaiki data: {e}")
+    
+    def backup(self):
+        backup_dir = QFileDialog.getExistingDirectory(self, "Pilih Folder Backup")
+        if not backup_dir:
+            return
+        
+        # Snapshot harus sesuai dengan change log, jadi tulis dulu semua
+        # perubahan yang masih tertunda
+        if not self.flush_data():
+            return
+        
+        try:
+            result = backup_data(backup_dir, self.change_log)
+            QMessageBox.information(self, "Sukses", f"Backup selesai: {result}")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Gagal membuat backup: {e}")
+    
     def generate_salary_report(self):
         try:
             from_date = self.from_date.date().toString("yyyy-MM-dd")
             to_date = self.to_date.date().toString("yyyy-MM-dd")
             
             # Load data karyawan
-            wb_emp = openpyxl.load_workbook("data/employees.xlsx")
+            wb_emp = self.store.get(EMPLOYEES_FILE)
             ws_emp = wb_emp["Employees"]
             
             employees = {}
@@ -561,7 +1556,7 @@ class LaundryPayrollApp(QMainWindow):
                     }
             
             # Load data absensi
-            wb_att = openpyxl.load_workbook("data/attendance.xlsx")
+            wb_att = self.store.get(ATTENDANCE_FILE)
             ws_att = wb_att["Attendance"]
             
             for row in ws_att.iter_rows(min_row=2, values_only=True):
@@ -725,7 +1720,79 @@ class LaundryPayrollApp(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Gagal mengekspor laporan: {e}")
 
+def check_data_cli(repair):
+    if not repair:
+        # Hanya membaca, gunakan mode read-only agar file besar tetap cepat
+        wb_emp = openpyxl.load_workbook(EMPLOYEES_FILE, read_only=True)
+        wb_att = openpyxl.load_workbook(ATTENDANCE_FILE, read_only=True)
+        try:
+            report = check_integrity(wb_emp["Employees"].iter_rows(min_row=2, values_only=True),
+                                     wb_att["Attendance"].iter_rows(min_row=2, values_only=True))
+        finally:
+            wb_emp.close()
+            wb_att.close()
+        print(report.summary())
+        return 1 if report.has_problems() else 0
+    
+    store = WorkbookStore()
+    change_log = ChangeLog()
+    if change_log.error:
+        print(f"Peringatan: {change_log.error}", file=sys.stderr)
+    recover_data(store, change_log)
+    
+    get_sheet = lambda name: store.get(SHEET_FILES[name])[name]
+    report = check_integrity(get_sheet("Employees").iter_rows(min_row=2, values_only=True),
+                             get_sheet("Attendance").iter_rows(min_row=2, values_only=True))
+    print(report.summary())
+    
+    change = report.repair_change()
+    if change is not None:
+        # Perbaikan dicatat di change log agar backup inkremental tetap sesuai
+        commit_change(store, change_log, change)
+        print("Data berhasil diperbaiki")
+    store.flush()
+    return 0
+
+def run_cli(args):
+    # Perintah tanpa GUI:
+    #   python main.py backup <folder_backup>
+    #   python main.py restore <folder_backup> <folder_tujuan>
+    #   python main.py check [--repair]
+    # Perintah yang memakai folder data/ ditolak selama GUI berjalan (DataLock)
+    try:
+        if args[0] == "check" and args[1:] in ([], ["--repair"]):
+            with DataLock():
+                return check_data_cli(repair=bool(args[1:]))
+        if args[0] == "backup" and len(args) == 2:
+            with DataLock():
+                print(backup_data(args[1], ChangeLog()))
+            return 0
+        if args[0] == "restore" and len(args) == 3:
+            seq = restore_data(args[1], args[2])
+            print(f"Data dipulihkan ke {args[2]} (seq {seq})")
+            return 0
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    
+    print("Penggunaan: main.py backup <folder_backup> | "
+          "main.py restore <folder_backup> <folder_tujuan> | "
+          "main.py check [--repair]", file=sys.stderr)
+    return 2
+
 if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
+    
     app = QApplication(sys.argv)
+    
+    # Kunci folder data selama aplikasi berjalan
+    data_lock = DataLock()
+    try:
+        data_lock.acquire()
+    except RuntimeError as e:
+        QMessageBox.critical(None, "Error", str(e))
+        sys.exit(1)
+    
     ex = LaundryPayrollApp()
     sys.exit(app.exec_())
\ No newline at end of file
@@ -0,0 +1,39 @@
+import os
+import sys
+
+import openpyxl
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Tes yang membuat jendela aplikasi tidak butuh layar
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import main
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    # Folder data/ kosong seperti saat aplikasi pertama kali dibuka
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Employees"
+    ws.append(["Nama", "Gaji Pokok", "Lembur"])
+    main.write_workbook_seq(wb, 0)
+    main.save_workbook_atomic(wb, main.EMPLOYEES_FILE)
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Attendance"
+    ws.append(["Tanggal", "Nama", "Status", "Jam Kerja", "Jam Lembur"])
+    main.write_workbook_seq(wb, 0)
+    main.save_workbook_atomic(wb, main.ATTENDANCE_FILE)
+
+    return tmp_path
+
+
+def read_rows(path, sheet):
+    wb = openpyxl.load_workbook(path)
+    return list(wb[sheet].iter_rows(min_row=2, values_only=True))
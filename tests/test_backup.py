@@ -0,0 +1,124 @@
+import os
+import stat
+
+import pytest
+
+import main
+from conftest import read_rows
+
+
+def open_data():
+    store = main.WorkbookStore()
+    change_log = main.ChangeLog()
+    main.recover_data(store, change_log)
+    return store, change_log
+
+
+def assert_same_data(restored_dir):
+    for sheet, path in main.SHEET_FILES.items():
+        restored = os.path.join(restored_dir, os.path.basename(path))
+        assert read_rows(restored, sheet) == read_rows(path, sheet)
+
+
+def test_backup_and_restore_round_trip(data_dir):
+    store, change_log = open_data()
+    main.commit_change(store, change_log, {"op": "add_employee", "row": ["Budi", 10000, 15000]})
+    main.commit_change(store, change_log, {"op": "add_attendance",
+                                           "rows": [["2026-03-01", "Budi", "Masuk", 9, 1]]})
+    store.flush()
+    assert main.backup_data("backup", change_log).startswith("Snapshot penuh")
+
+    main.commit_change(store, change_log, {"op": "edit_employee", "old_name": "Budi",
+                                           "row": ["Budi S", 11000, 15000]})
+    main.commit_change(store, change_log, {"op": "delete_attendance", "date": "2026-03-01"})
+    main.commit_change(store, change_log, {"op": "add_attendance",
+                                           "rows": [["2026-03-01", "Budi S", "Masuk", 8, 2]]})
+    store.flush()
+    main.backup_data("backup", change_log)
+    assert main.backup_data("backup", change_log) == "Tidak ada perubahan sejak backup terakhir"
+
+    assert main.restore_data("backup", "restored") == change_log.last_seq
+    assert_same_data("restored")
+
+    # Data hasil restore mendapat log baru, jadi backup berikutnya snapshot penuh
+    restored_log = main.ChangeLog(os.path.join("restored", "changes.log"))
+    assert restored_log.last_seq == change_log.last_seq
+    assert restored_log.log_id != change_log.log_id
+
+
+def test_crash_before_flush_is_recovered(data_dir):
+    store, change_log = open_data()
+    main.commit_change(store, change_log, {"op": "add_employee", "row": ["Budi", 10000, 15000]})
+    store.flush()
+    main.commit_change(store, change_log, {"op": "add_attendance",
+                                           "rows": [["2026-03-01", "Budi", "Masuk", 9, 1]]})
+    # Crash: store tidak pernah di-flush
+
+    # Backup headless sebelum aplikasi dibuka lagi tetap sesuai dengan log
+    main.backup_data("backup", main.ChangeLog())
+
+    store, change_log = open_data()
+    store.flush()
+    assert read_rows(main.ATTENDANCE_FILE, "Attendance") == [("2026-03-01", "Budi", "Masuk", 9, 1)]
+    assert read_rows(main.EMPLOYEES_FILE, "Employees") == [("Budi", 10000, 15000)]
+
+    main.restore_data("backup", "restored")
+    assert_same_data("restored")
+
+
+def test_new_log_forces_new_snapshot(data_dir):
+    store, change_log = open_data()
+    main.commit_change(store, change_log, {"op": "add_employee", "row": ["Budi", 10000, 15000]})
+    store.flush()
+    main.backup_data("backup", change_log)
+
+    os.remove(main.CHANGE_LOG_FILE)
+    store, change_log = open_data()
+    for name in ("Ani", "Joko"):
+        main.commit_change(store, change_log, {"op": "add_employee", "row": [name, 9000, 12000]})
+    store.flush()
+
+    assert main.backup_data("backup", change_log).startswith("Snapshot penuh")
+    main.restore_data("backup", "restored")
+    assert_same_data("restored")
+
+
+def test_corrupt_log_line_starts_new_log(data_dir):
+    store, change_log = open_data()
+    main.commit_change(store, change_log, {"op": "add_employee", "row": ["Budi", 10000, 15000]})
+    with open(main.CHANGE_LOG_FILE, "a", encoding="utf-8") as f:
+        f.write("{bukan json}\n")
+
+    change_log = main.ChangeLog()
+    assert "rusak" in change_log.error
+    assert change_log.last_seq == 1
+    assert change_log.append({"op": "delete_employee", "name": "Budi"})["seq"] == 2
+
+
+def test_truncated_log_line_is_dropped(data_dir):
+    store, change_log = open_data()
+    main.commit_change(store, change_log, {"op": "add_employee", "row": ["Budi", 10000, 15000]})
+    with open(main.CHANGE_LOG_FILE, "a", encoding="utf-8") as f:
+        f.write('{"seq": 2, "op"')
+
+    change_log = main.ChangeLog()
+    assert change_log.error is None
+    assert change_log.last_seq == 1
+    assert [r["seq"] for r in change_log.read_since(0)] == [1]
+
+
+def test_atomic_save_keeps_file_mode(data_dir):
+    os.chmod(main.EMPLOYEES_FILE, 0o640)
+    store, change_log = open_data()
+    main.commit_change(store, change_log, {"op": "add_employee", "row": ["Budi", 10000, 15000]})
+    store.flush()
+    assert stat.S_IMODE(os.stat(main.EMPLOYEES_FILE).st_mode) == 0o640
+
+
+def test_data_lock_is_exclusive(data_dir):
+    with main.DataLock():
+        with pytest.raises(RuntimeError):
+            main.DataLock().acquire()
+    with main.DataLock():
+        pass
+    assert main.run_cli(["backup", "backup"]) == 0
@@ -0,0 +1,184 @@
+from datetime import datetime
+
+import openpyxl
+import pytest
+from PyQt5.QtCore import QDate
+from PyQt5.QtWidgets import QApplication, QFileDialog, QMessageBox
+
+import main
+from conftest import read_rows
+
+
+def write_rows(path, sheet, rows):
+    wb = openpyxl.load_workbook(path)
+    for row in rows:
+        wb[sheet].append(row)
+    main.save_workbook_atomic(wb, path)
+
+
+def fill_problem_data():
+    write_rows(main.EMPLOYEES_FILE, "Employees", [
+        ["Budi", 10000, "15.000"],
+        ["Ani", 9000, 12000],
+    ])
+    write_rows(main.ATTENDANCE_FILE, "Attendance", [
+        ["2026-03-01", "Budi", "Masuk", 9, 0],
+        ["2026-03-01", "Budi", "Masuk", "8", 1],
+        ["2026-03-01", "Joko", "Masuk", 9, 0],
+        [datetime(2026, 3, 4), "Ani", "Masuk", "7,5", "abc"],
+    ])
+
+
+def scan(store):
+    get_sheet = lambda name: store.get(main.SHEET_FILES[name])[name]
+    return main.check_integrity(get_sheet("Employees").iter_rows(min_row=2, values_only=True),
+                                get_sheet("Attendance").iter_rows(min_row=2, values_only=True))
+
+
+def test_check_integrity_reports_problems(data_dir):
+    fill_problem_data()
+    report = scan(main.WorkbookStore())
+
+    assert [orphan[:3] for orphan in report.orphans] == [(4, "Joko", "2026-03-01")]
+    assert [duplicate[:4] for duplicate in report.duplicates] == [(2, "Budi", "2026-03-01", 3)]
+    assert [day.isoformat() for day in report.gaps] == ["2026-03-02", "2026-03-03"]
+    assert sorted(error[:5] for error in report.type_errors) == [
+        ("Attendance", 3, 4, "8", 8),
+        ("Attendance", 5, 1, datetime(2026, 3, 4), "2026-03-04"),
+        ("Attendance", 5, 4, "7,5", None),
+        ("Attendance", 5, 5, "abc", None),
+        ("Employees", 2, 3, "15.000", 15000),
+    ]
+
+
+def test_check_integrity_clean_data(data_dir):
+    write_rows(main.EMPLOYEES_FILE, "Employees", [["Budi", 10000, 15000]])
+    write_rows(main.ATTENDANCE_FILE, "Attendance", [["2026-03-01", "Budi", "Masuk", 9, 0]])
+    assert not scan(main.WorkbookStore()).has_problems()
+
+
+def test_repair_matches_rows_by_content(data_dir):
+    fill_problem_data()
+    store = main.WorkbookStore()
+    change = scan(store).repair_change()
+
+    # Sheet tujuan punya baris tambahan di awal sehingga semua nomor baris bergeser
+    ws = store.get(main.ATTENDANCE_FILE)["Attendance"]
+    ws.insert_rows(2)
+    for col_idx, value in enumerate(["2026-02-28", "Ani", "Masuk", 9, 0], start=1):
+        ws.cell(row=2, column=col_idx).value = value
+
+    get_sheet = lambda name: store.get(main.SHEET_FILES[name])[name]
+    main.apply_change(get_sheet, change)
+
+    assert list(ws.iter_rows(min_row=2, values_only=True)) == [
+        ("2026-02-28", "Ani", "Masuk", 9, 0),
+        ("2026-03-01", "Budi", "Masuk", 8, 1),
+        ("2026-03-04", "Ani", "Masuk", "7,5", "abc"),
+    ]
+    employees = store.get(main.EMPLOYEES_FILE)["Employees"]
+    assert list(employees.iter_rows(min_row=2, values_only=True)) == [
+        ("Budi", 10000, 15000),
+        ("Ani", 9000, 12000),
+    ]
+
+
+def test_repair_survives_backup_and_restore(data_dir):
+    write_rows(main.EMPLOYEES_FILE, "Employees", [["Budi", 10000, 15000]])
+    store = main.WorkbookStore()
+    change_log = main.ChangeLog()
+    main.recover_data(store, change_log)
+    main.backup_data("backup", change_log)
+
+    main.commit_change(store, change_log, {"op": "add_attendance", "rows": [
+        ["2026-03-01", "Budi", "Masuk", 9, 0],
+        ["2026-03-01", "Budi", "Masuk", 8, 1],
+    ]})
+    main.commit_change(store, change_log, scan(store).repair_change())
+    store.flush()
+    main.backup_data("backup", change_log)
+
+    main.restore_data("backup", "restored")
+    assert read_rows("restored/attendance.xlsx", "Attendance") == [("2026-03-01", "Budi", "Masuk", 8, 1)]
+    assert read_rows(main.ATTENDANCE_FILE, "Attendance") == [("2026-03-01", "Budi", "Masuk", 8, 1)]
+
+
+def test_dates_must_be_zero_padded(data_dir):
+    write_rows(main.EMPLOYEES_FILE, "Employees", [["Budi", 10000, 15000]])
+    write_rows(main.ATTENDANCE_FILE, "Attendance", [["2024-3-1", "Budi", "Masuk", 9, 0]])
+    store = main.WorkbookStore()
+    report = scan(store)
+    assert [error[:5] for error in report.type_errors] == [
+        ("Attendance", 2, 1, "2024-3-1", "2024-03-01"),
+    ]
+
+    get_sheet = lambda name: store.get(main.SHEET_FILES[name])[name]
+    main.apply_change(get_sheet, report.repair_change())
+    index = main.AttendanceIndex(get_sheet("Attendance").iter_rows(min_row=2, values_only=True))
+    assert index.search("", "2024-03-01", "2024-03-01") == [("2024-03-01", "Budi", "Masuk", 9, 0)]
+
+
+def test_only_exact_integers_are_repaired(data_dir):
+    write_rows(main.EMPLOYEES_FILE, "Employees", [
+        ["Budi", "10,000", "15.000"],
+        ["Ani", 9000.5, 12000.0],
+    ])
+    write_rows(main.ATTENDANCE_FILE, "Attendance", [
+        ["2026-03-01", "Budi", "Masuk", "7,5", 9.0],
+        ["2026-03-01", "Ani", "Masuk", 7.5, "2"],
+    ])
+    # 9.0 dan 12000.0 tersimpan di xlsx sebagai bilangan bulat
+    report = scan(main.WorkbookStore())
+    assert sorted(error[:5] for error in report.type_errors) == [
+        ("Attendance", 2, 4, "7,5", None),
+        ("Attendance", 3, 4, 7.5, None),
+        ("Attendance", 3, 5, "2", 2),
+        ("Employees", 2, 2, "10,000", None),
+        ("Employees", 2, 3, "15.000", 15000),
+        ("Employees", 3, 2, 9000.5, None),
+    ]
+
+
+def test_rows_without_valid_date_are_not_duplicates(data_dir):
+    write_rows(main.EMPLOYEES_FILE, "Employees", [["Budi", 10000, 15000]])
+    write_rows(main.ATTENDANCE_FILE, "Attendance", [
+        [None, "Budi", "Masuk", 9, 0],
+        ["kemarin", "Budi", "Masuk", 8, 0],
+        [None, "Budi", "Masuk", 7, 0],
+    ])
+    report = scan(main.WorkbookStore())
+    assert report.duplicates == []
+    assert report.repair_change() is None
+    assert len(report.type_errors) == 3
+
+
+@pytest.fixture
+def window(data_dir, monkeypatch):
+    app = QApplication.instance() or QApplication([])
+    for name in ("information", "warning", "critical"):
+        monkeypatch.setattr(QMessageBox, name, staticmethod(lambda *args: None))
+    window = main.LaundryPayrollApp()
+    yield window
+    window.store.flush()
+    window.deleteLater()
+
+
+def test_repaired_values_work_in_salary_report_and_export(window, monkeypatch):
+    window.record_change({"op": "add_employee", "row": ["Budi", 10000, 15000]})
+    window.store.get(main.ATTENDANCE_FILE)["Attendance"].append(["2026-3-1", "Budi", "Masuk", "8", 1])
+    window.store.get(main.ATTENDANCE_FILE)["Attendance"].append(["2026-03-02", "Budi", "Masuk", 9.0, "2"])
+
+    window.record_change(scan(window.store).repair_change())
+    assert not scan(window.store).type_errors
+
+    window.from_date.setDate(QDate(2026, 3, 1))
+    window.to_date.setDate(QDate(2026, 3, 31))
+    window.generate_salary_report()
+    cells = [window.salary_table.item(0, col).text() for col in range(7)]
+    assert cells == ["Budi", "2", "17", "3", "Rp 170.000", "Rp 45.000", "Rp 215.000"]
+
+    monkeypatch.setattr(QFileDialog, "getSaveFileName",
+                        staticmethod(lambda *args, **kwargs: ("laporan.xlsx", "")))
+    window.export_to_excel()
+    ws = openpyxl.load_workbook("laporan.xlsx").active
+    assert [cell.value for cell in ws[5]] == ["Budi", 2, 17, 3, 170000, 45000, 215000]
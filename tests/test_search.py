@@ -0,0 +1,49 @@
+import main
+
+
+ROWS = [
+    ("2026-03-02", "Budi Santoso", "Masuk", 9, 4),
+    ("2026-03-01", "Ani", "Masuk", 9, 0),
+    ("2026-03-01", "Budi Santoso", "Masuk", 9, 1),
+    ("2026-04-01", "Budi Santoso", "Masuk", 9, "x"),
+    (None, "Tanpa Tanggal", "Masuk", 1, 1),
+    ("2026-03-05", "Andi", "Masuk", 8, 5),
+]
+
+
+def test_search_by_name_prefix_and_date_range():
+    index = main.AttendanceIndex(ROWS)
+    assert index.search("bud", "2026-03-01", "2026-03-31") == [
+        ("2026-03-01", "Budi Santoso", "Masuk", 9, 1),
+        ("2026-03-02", "Budi Santoso", "Masuk", 9, 4),
+    ]
+    # Awalan juga dicocokkan ke kata berikutnya di nama
+    assert len(index.search("santo")) == 3
+    assert index.search("zz") == []
+
+
+def test_search_by_date_and_overtime():
+    index = main.AttendanceIndex(ROWS)
+    assert index.search(from_date="2026-03-01", to_date="2026-03-01") == [
+        ("2026-03-01", "Ani", "Masuk", 9, 0),
+        ("2026-03-01", "Budi Santoso", "Masuk", 9, 1),
+    ]
+    assert index.search("", "2026-03-01", "2026-03-31", min_overtime=3) == [
+        ("2026-03-02", "Budi Santoso", "Masuk", 9, 4),
+        ("2026-03-05", "Andi", "Masuk", 8, 5),
+    ]
+
+
+def test_incremental_updates_match_rebuilt_index():
+    index = main.AttendanceIndex(ROWS)
+    new_rows = [["2026-03-01", "Citra", "Masuk", 9, 2], ["2026-03-03", "Ani", "Masuk", 7, 0]]
+    index.add_rows(new_rows)
+    index.delete_date("2026-03-05")
+
+    rows = [row for row in ROWS if row[0] != "2026-03-05"] + [tuple(row) for row in new_rows]
+    rebuilt = main.AttendanceIndex(rows)
+    assert index.rows == rebuilt.rows
+    assert index.by_name == rebuilt.by_name
+    assert index.name_keys == rebuilt.name_keys
+    assert index.search("and") == []
+    assert index.search("cit") == [("2026-03-01", "Citra", "Masuk", 9, 2)]